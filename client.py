@@ -1,32 +1,215 @@
 import asyncio
-import json
+import re
 import sys
-import time  # <-- ADDED IMPORT
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Tuple
+
+import httpx
+from aioconsole import ainput
+import msgspec
+import orjson
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-# For Ollama integration
-import ollama
-
 # Import configuration
 from config import (
-    LLM_MODEL, TOOL_SELECTION_TEMPERATURE, RESPONSE_TEMPERATURE,
+    LLM_MODEL, TOOL_SELECTION_MODEL, CHAT_MODEL, TOOL_SELECTION_TEMPERATURE, RESPONSE_TEMPERATURE,
     CHAT_TEMPERATURE, TOOL_SELECTION_MAX_TOKENS, RESPONSE_MAX_TOKENS,
-    CHAT_MAX_TOKENS, TOP_P, ENABLE_STREAMING
+    CHAT_MAX_TOKENS, TOP_P, ENABLE_STREAMING, TOOL_SELECTION_CACHE_SIZE,
+    ENABLE_SPECULATIVE_PREFETCH, LLM_BACKEND, LLAMA_SERVER_URL,
+    OLLAMA_URL, LLM_REQUEST_TIMEOUT, STREAM_FLUSH_INTERVAL, STREAM_FLUSH_CHARS,
+    LLM_KEEP_ALIVE, RESPONSE_DATA_MAX_ITEMS, RESPONSE_DATA_MAX_CHARS,
+    LLAMA_DRAFT_MAX_TOKENS
+)
+
+
+class ToolCall(msgspec.Struct):
+    """Tool selection decoded from the LLM's JSON reply"""
+    tool: str
+    arguments: dict = {}
+
+
+# Shared typed decoder - validates the shape while parsing
+_TOOL_DECODER = msgspec.json.Decoder(ToolCall)
+
+
+# Constant prompt pieces, built once at import; only the user text varies per turn
+# (the decision head gets the server's tool list filled in once on connect)
+_DECISION_HEAD = """Analyze the user's question and select the single BEST tool to answer it.
+
+Tools:
+{tools}
+- none: greetings, casual chat
+
+Question: \""""
+_DECISION_TAIL = """\"
+
+Respond ONLY with a JSON object. Do not include any text, thoughts, or markdown code fences (```json).
+The JSON must follow this structure: {"tool": "tool_name", "arguments": {"arg1": "value1", ...}}
+
+JSON:"""
+
+# Placeholder for the user's question inside the pre-encoded decision request
+_PROMPT_SLOT = "\x00Q\x00"
+_PROMPT_SLOT_JSON = orjson.dumps(_PROMPT_SLOT)[1:-1]
+
+# Run with lower temperature for faster, more deterministic responses
+_DECISION_OPTIONS = {
+    "temperature": TOOL_SELECTION_TEMPERATURE,
+    "top_p": 0.5,
+    "num_predict": TOOL_SELECTION_MAX_TOKENS,
+}
+
+_RESPONSE_HEAD = """You are BMSCE Assistant, a friendly AI for BMS College students.
+
+Student asked: \""""
+_RESPONSE_MID = """\"
+
+Data retrieved:
+"""
+_RESPONSE_TAIL = """
+
+Present this naturally and conversationally. Use neutral pronouns (they/them) for people.
+
+Guidelines:
+- Be warm and helpful like a senior student
+- Use clear numbering or bullet points for lists
+- **Crucially: Only include coherent, well-formed contact details (Name, Role, Contact). Aggressively filter out and discard any fragmented, garbled, or unformatted text fragments.**
+- Keep it concise but informative
+- Use emojis sparingly
+- End with a friendly note if appropriate
+
+Your response:"""
+
+_CHAT_HEAD = """You are BMSCE Assistant for BMS College students.
+
+    User: """
+_CHAT_TAIL = """
+
+    Respond warmly and concisely. 
+    No markdown formatting. Do not use any Markdown formatting like bolding (`**...**`) or italics.
+    Focus ONLY on answering the user's message.
+    CRITICAL RULE: If you are asked for specific information (names, dates, etc.) and don't know it, state clearly that you do not have that specific information. DO NOT fabricate.
+
+    Response:"""
+
+
+def _llm_request(model: str, prompt: str, options: Dict[str, Any], stream: bool) -> Tuple[str, bytes]:
+    """Build the endpoint path and JSON body for a generation on the configured backend"""
+    if LLM_BACKEND == "llama_server":
+        # llama-server serves a single model and uses its own option names
+        payload = {
+            "prompt": prompt,
+            "temperature": options["temperature"],
+            "top_p": options["top_p"],
+            "n_predict": options["num_predict"],
+            "stream": stream,
+            # Only takes effect when the server was started with --model-draft
+            "speculative.n_max": LLAMA_DRAFT_MAX_TOKENS,
+        }
+        return "/completion", orjson.dumps(payload)
+
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": options,
+        "keep_alive": LLM_KEEP_ALIVE,
+    }
+    return "/api/generate", orjson.dumps(payload)
+
+
+def _write_out(pending: list):
+    """Write buffered stream text to the terminal in a single flush"""
+    if pending:
+        sys.stdout.write("".join(pending))
+        sys.stdout.flush()
+        pending.clear()
+
+
+def _compact(data: Any) -> Any:
+    """Trim tool output for the response prompt: cap list lengths and long strings"""
+    if isinstance(data, dict):
+        return {key: _compact(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_compact(item) for item in data[:RESPONSE_DATA_MAX_ITEMS]]
+    if isinstance(data, str) and len(data) > RESPONSE_DATA_MAX_CHARS:
+        return data[:RESPONSE_DATA_MAX_CHARS] + "..."
+    return data
+
+
+# Patterns for intents that don't need the LLM to classify them
+_GREETING_RE = re.compile(r'^(hi|hello|hey|thanks|thank you|thx|bye|good (morning|afternoon|evening|night))\W*$', re.I)
+# Events and notices only mean the website feed when asked for as current
+# ("upcoming events"); "events of the ACM club" is a knowledge base question
+_NEWS_RE = re.compile(
+    r'\bnews\b|\b(latest|recent|upcoming|new|current)\s+(\w+\s+)?(events?|festivals?|workshops?|fests?)\b', re.I
+)
+_NOTIF_RE = re.compile(
+    r'\b(notifications?|circulars?)\b|\b(latest|recent|upcoming|new|current)\s+(\w+\s+)?(notices?|announcements?|deadlines?)\b', re.I
+)
+# The title is case-insensitive but the name must be capitalized, so
+# "professor details" is not mistaken for a professor called "details".
+# A name is at most three words; a single letter only counts as an initial
+# when more name words follow ("Dr K S Rao"), and capitalized filler words end
+# the name ("Prof Rao And His Email" -> "Rao"). "Faculty"/"teacher" are not
+# titles here ("Faculty Development Program"); a name that turns out not to be
+# a professor ("Dr. Ambedkar scholarship") is handed back to the LLM
+_NAME_WORD = r'(?!(?:And|Or|Of|In|Is|From|His|Her|Their|Email|Phone|Number|Contact|Details|Department)\b)[A-Z](?:[a-z]+|\.?(?=\s+[A-Z]))'
+_PROF_RE = re.compile(
+    r'\b(?i:professor|prof\.?|dr\.?)\s+(' + _NAME_WORD + r'(?:\s+' + _NAME_WORD + r'){0,2})\b'
 )
 
+
+def _match_intent(user_message: str) -> Optional[ToolCall]:
+    """Route obvious messages without an LLM call; None means ask the LLM"""
+    if _GREETING_RE.match(user_message):
+        return ToolCall(tool='none')
+    if _NEWS_RE.search(user_message):
+        return ToolCall(tool='get_latest_news')
+    if _NOTIF_RE.search(user_message):
+        return ToolCall(tool='get_college_notifications')
+    match = _PROF_RE.search(user_message)
+    if match:
+        return ToolCall(tool='get_professor_details', arguments={'name': match.group(1)})
+    return None
+
+
+_GREETINGS = frozenset({'hi', 'hello', 'hey', 'thanks', 'thank', 'bye'})
+
+
+def _should_prefetch(user_message: str) -> bool:
+    """Cheap guess at whether a message is a real question rather than chit-chat"""
+    words = user_message.lower().split()
+    return len(words) > 3 and words[0].strip('!,.?') not in _GREETINGS
+
+
+def _discard(task: asyncio.Task):
+    """Cancel an unneeded prefetch; if it already failed, retrieve the error so asyncio doesn't log it"""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
 class MCPClient:
     def __init__(self):
         self.session: Optional[ClientSession] = None
         self.available_tools = []
         self.client_context = None
         self.session_context = None
-        # Map tools that require arguments for easy validation
-        self.tool_arg_map = {
-            'query_knowledge_base': ['query_text'],
-            'get_professor_details': ['name']
+        # Argument checks for tools that require arguments; tools not listed need none
+        self._validators: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+            'query_knowledge_base': lambda args: bool(args.get('query_text')),
+            'get_professor_details': lambda args: bool(args.get('name'))
         }
+        # Pooled HTTP client for the LLM backend, opened in connect_to_server
+        self.http: Optional[httpx.AsyncClient] = None
+        # Tool descriptions and the pre-encoded decision request, built on connect
+        self._tools_desc = ""
+        self._decision_path = ""
+        self._decision_body = b""
+        # Recent tool-selection replies keyed by normalized user message
+        self._decision_cache: "OrderedDict[str, str]" = OrderedDict()
 
     async def connect_to_server(self, server_script_path: str):
         """Connect to the MCP server"""
@@ -46,96 +229,171 @@ class MCPClient:
 
         response = await self.session.list_tools()
         self.available_tools = response.tools
+
+        # The tool list is fixed for the session, so describe it once
+        tools_desc = []
+        for tool in self.available_tools:
+            desc = f"- {tool.name}: {' '.join((tool.description or '').split())}"
+            required = tool.inputSchema.get("required", [])
+            if required:
+                desc += " (requires " + ", ".join(f'"{arg}"' for arg in required) + ")"
+            tools_desc.append(desc)
+        self._tools_desc = "\n".join(tools_desc)
+
+        # Optimized decision prompt - STRICT JSON output requested. The whole
+        # request is encoded once here, with a slot where the question goes
+        decision_prompt = _DECISION_HEAD.format(tools=self._tools_desc) + _PROMPT_SLOT + _DECISION_TAIL
+        self._decision_path, self._decision_body = _llm_request(
+            TOOL_SELECTION_MODEL, decision_prompt, _DECISION_OPTIONS, stream=False
+        )
+
+        # One keep-alive client so every turn reuses the same connections
+        self.http = httpx.AsyncClient(
+            base_url=LLAMA_SERVER_URL if LLM_BACKEND == "llama_server" else OLLAMA_URL,
+            headers={"Content-Type": "application/json"},
+            timeout=LLM_REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+        await self._warm_up()
+
         print(f"✅ Connected to MCP Server\n")
 
+    async def _warm_up(self):
+        """Load the models into memory now so the first question doesn't pay for it"""
+        if LLM_BACKEND != "ollama":
+            return  # llama-server loads its model at startup
+
+        for model in dict.fromkeys([TOOL_SELECTION_MODEL, CHAT_MODEL, LLM_MODEL]):
+            try:
+                # An empty prompt makes Ollama load the model without generating
+                await self._llm_complete(model, "", {"temperature": 0, "top_p": 1, "num_predict": 1})
+            except httpx.HTTPError as e:
+                print(f"⚠️  Could not preload {model}: {e}")
+
     async def process_tool_call(self, tool_name: str, tool_args: Dict[str, Any]) -> str:
         """Execute a tool call on the MCP server"""
         if not self.session:
             raise RuntimeError("Not connected to server")
 
         result = await self.session.call_tool(tool_name, tool_args)
+        if not result.content:
+            return "[]"  # Nothing returned: handled like an empty result
         return result.content[0].text
 
     def get_tools_for_llm(self) -> str:
         """Convert MCP tools to natural language description"""
-        tools_desc = []
-        for tool in self.available_tools:
-            desc = f"- {tool.name}: {tool.description}"
-            tools_desc.append(desc)
-        return "\n".join(tools_desc)
+        return self._tools_desc
 
-    async def generate_response(self, prompt: str, temperature: float, max_tokens: int):
+    async def generate_response(self, prompt: str, temperature: float, max_tokens: int, model: str = LLM_MODEL):
         """Generate response with optional streaming based on config"""
         
+        options = {
+            "temperature": temperature,
+            "top_p": TOP_P,
+            "num_predict": max_tokens,
+        }
+
         if ENABLE_STREAMING:
             # Stream the response
+            # Batch tokens into one write every few ms instead of one per token
+            pending = []
             try:
-                stream = ollama.generate(
-                    model=LLM_MODEL,
-                    prompt=prompt,
-                    stream=True,
-                    options={
-                        "temperature": temperature,
-                        "top_p": TOP_P,
-                        "num_predict": max_tokens,
-                    }
-                )
-
-                for chunk in stream:
-                    if 'response' in chunk:
-                        print(chunk['response'], end='', flush=True)
-                
+                last_flush = time.monotonic()
+                pending_chars = 0
+                async for text in self._llm_stream(model, prompt, options):
+                    pending.append(text)
+                    pending_chars += len(text)
+                    now = time.monotonic()
+                    if pending_chars > STREAM_FLUSH_CHARS or now - last_flush > STREAM_FLUSH_INTERVAL:
+                        _write_out(pending)
+                        last_flush = now
+                        pending_chars = 0
+
+                _write_out(pending)
                 print("\n")  # Add newline at the end
                 
             except Exception as e:
+                _write_out(pending)
                 print(f"Error during streaming: {e}")
                 # Fallback to non-streaming
                 print("Falling back to non-streaming...")
-                response = ollama.generate(
-                    model=LLM_MODEL,
-                    prompt=prompt,
-                    options={
-                        "temperature": temperature,
-                        "top_p": TOP_P,
-                        "num_predict": max_tokens,
-                    }
-                )
-                print(f"{response['response'].strip()}\n")
+                response_text = await self._llm_complete(model, prompt, options)
+                print(f"{response_text.strip()}\n")
         else:
             # Non-streaming response
-            response = ollama.generate(
-                model=LLM_MODEL,
-                prompt=prompt,
-                options={
-                    "temperature": temperature,
-                    "top_p": TOP_P,
-                    "num_predict": max_tokens,
-                }
-            )
-            print(f"{response['response'].strip()}\n")
+            response_text = await self._llm_complete(model, prompt, options)
+            print(f"{response_text.strip()}\n")
+
+    async def _llm_complete(self, model: str, prompt: str, options: Dict[str, Any]) -> str:
+        """Run a single non-streaming generation on the configured backend"""
+        path, body = _llm_request(model, prompt, options, stream=False)
+        return await self._llm_post(path, body)
+
+    async def _llm_post(self, path: str, body: bytes) -> str:
+        """POST a prebuilt non-streaming request body and return the generated text"""
+        response = await self.http.post(path, content=body)
+        response.raise_for_status()
+
+        data = orjson.loads(response.content)
+        return data["content"] if LLM_BACKEND == "llama_server" else data["response"]
+
+    async def _llm_stream(self, model: str, prompt: str, options: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield generated text as it arrives from the configured backend"""
+        path, body = _llm_request(model, prompt, options, stream=True)
+        async with self.http.stream("POST", path, content=body) as response:
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if LLM_BACKEND == "llama_server":
+                    # Server-sent events: one 'data: {...}' line per chunk
+                    if not line.startswith("data: "):
+                        continue
+                    chunk = orjson.loads(line[6:])
+                    yield chunk.get("content", "")
+                    if chunk.get("stop"):
+                        break
+                else:
+                    # Ollama streams one JSON object per line
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    yield chunk.get("response", "")
+                    if chunk.get("done"):
+                        break
+
+    async def _select_tool(self, user_message: str) -> str:
+        """
+        Ask the LLM which tool to use and return its raw reply.
+        Selection runs at near-zero temperature, so replies are cached per
+        normalized message and repeat questions skip the LLM call.
+        """
+        cached = self._decision_cache.get(user_message)
+        if cached is not None:
+            self._decision_cache.move_to_end(user_message)
+            return cached
+
+        # Splice the JSON-escaped message into the prebuilt request body;
+        # the static prompt, options and model are never re-encoded
+        body = self._decision_body.replace(_PROMPT_SLOT_JSON, orjson.dumps(user_message)[1:-1])
+        decision_text = await self._llm_post(self._decision_path, body)
+
+        self._decision_cache[user_message] = decision_text
+        if len(self._decision_cache) > TOOL_SELECTION_CACHE_SIZE:
+            self._decision_cache.popitem(last=False)
+        return decision_text
 
     async def make_natural_response(self, user_query: str, raw_data: str):
         """Convert raw JSON data into natural, student-friendly response"""
 
         # Optimized prompt
-        prompt = f"""You are BMSCE Assistant, a friendly AI for BMS College students.
-
-Student asked: "{user_query}"
-
-Data retrieved:
-{raw_data}
-
-Present this naturally and conversationally. Use neutral pronouns (they/them) for people.
-
-Guidelines:
-- Be warm and helpful like a senior student
-- Use clear numbering or bullet points for lists
-- **Crucially: Only include coherent, well-formed contact details (Name, Role, Contact). Aggressively filter out and discard any fragmented, garbled, or unformatted text fragments.**
-- Keep it concise but informative
-- Use emojis sparingly
-- End with a friendly note if appropriate
+        # Prompt length drives LLM latency, so send the data in compact form
+        try:
+            data = orjson.loads(raw_data)
+            raw_data = orjson.dumps(_compact(data)).decode()
+        except orjson.JSONDecodeError:
+            pass  # Not JSON (e.g. an error message), use as-is
 
-Your response:"""
+        prompt = _RESPONSE_HEAD + user_query + _RESPONSE_MID + raw_data + _RESPONSE_TAIL
 
         await self.generate_response(prompt, RESPONSE_TEMPERATURE, RESPONSE_MAX_TOKENS)
 
@@ -157,7 +415,7 @@ Your response:"""
             if ENABLE_STREAMING:
                 for char in response_text:
                     print(char, end='', flush=True)
-                    time.sleep(0.015) # Adjust delay as needed
+                    await asyncio.sleep(0.015) # Adjust delay as needed
                 print("\n")
             else:
                 print(f"{response_text}\n")
@@ -169,68 +427,69 @@ Your response:"""
         # because the 'if error_message:' block above will catch all tool failures.
         
         # Optimized chat prompt
-        chat_prompt = f"""You are BMSCE Assistant for BMS College students.
-
-    User: {user_message}
-
-    Respond warmly and concisely. 
-    No markdown formatting. Do not use any Markdown formatting like bolding (`**...**`) or italics.
-    Focus ONLY on answering the user's message.
-    CRITICAL RULE: If you are asked for specific information (names, dates, etc.) and don't know it, state clearly that you do not have that specific information. DO NOT fabricate.
-
-    Response:"""
+        chat_prompt = _CHAT_HEAD + user_message + _CHAT_TAIL
         
         # Generate chat response
-        await self.generate_response(chat_prompt, CHAT_TEMPERATURE, CHAT_MAX_TOKENS)
+        await self.generate_response(chat_prompt, CHAT_TEMPERATURE, CHAT_MAX_TOKENS, CHAT_MODEL)
     # --- END OF REPLACED FUNCTION ---
 
-    async def chat_with_mistral(self, user_message: str):
+    async def _decide_with_prefetch(self, user_message: str) -> Tuple[Optional[ToolCall], Optional[asyncio.Task]]:
         """
-        Chat with Mistral using MCP tools with improved tool selection and error handling.
+        Let the LLM pick a tool, prefetching a knowledge base search meanwhile.
+        Returns the tool call and the prefetch task if its result is usable.
         """
+        # Most real questions end up in the knowledge base, so start that search
+        # now and let it run while the LLM is still picking a tool
+        speculative = None
+        if ENABLE_SPECULATIVE_PREFETCH and _should_prefetch(user_message):
+            speculative = asyncio.create_task(
+                self.process_tool_call('query_knowledge_base', {'query_text': user_message})
+            )
 
-        # Optimized decision prompt - STRICT JSON output requested
-        decision_prompt = f"""Analyze the user's question and select the single BEST tool to answer it.
-
-Tools:
-1. get_latest_news - news, events, festivals, workshops
-2. get_college_notifications - official notices, announcements, deadlines
-3. query_knowledge_base - search syllabus,academic topics,clubs,research and development,exams, rules and regulations, governance structure
-  (requires "query_text")
-4. get_professor_details - professor info (requires "name")
-5. none - greetings, casual chat
-
-Question: "{user_message}"
-
-Respond ONLY with a JSON object. Do not include any text, thoughts, or markdown code fences (```json).
-The JSON must follow this structure: {{"tool": "tool_name", "arguments": {{"arg1": "value1", ...}}}}
-
-JSON:"""
+        # Normalize so repeated questions share one cached decision
+        try:
+            decision_text = await self._select_tool(" ".join(user_message.lower().split()))
+        except BaseException:
+            if speculative:
+                _discard(speculative)
+            raise
+        tool_call = self._extract_tool_call(decision_text)
+
+        # Keep the prefetched search only if the LLM chose that same tool
+        if speculative and not (
+            tool_call
+            and tool_call.tool == 'query_knowledge_base'
+            and tool_call.arguments.get('query_text')
+            and set(tool_call.arguments) == {'query_text'}
+        ):
+            _discard(speculative)
+            speculative = None
+
+        return tool_call, speculative
+
+    async def chat_with_mistral(self, user_message: str, route_by_pattern: bool = True):
+        """
+        Chat with Mistral using MCP tools with improved tool selection and error handling.
+        """
 
-        # Run with lower temperature for faster, more deterministic responses
-        decision_response = ollama.generate(
-            model=LLM_MODEL,
-            prompt=decision_prompt,
-            options={
-                "temperature": TOOL_SELECTION_TEMPERATURE,
-                "top_p": 0.5,
-                "num_predict": TOOL_SELECTION_MAX_TOKENS,
-            }
-        )
+        # Obvious intents are routed by pattern, skipping the LLM entirely
+        tool_call = _match_intent(user_message) if route_by_pattern else None
+        routed = tool_call is not None
+        speculative = None
+        if tool_call is None:
+            tool_call, speculative = await self._decide_with_prefetch(user_message)
 
-        tool_call = self._extract_tool_call(decision_response['response'])
-        
         # 1. Handle 'none' tool or failed extraction
-        if not tool_call or tool_call.get('tool') == 'none':
+        if not tool_call or tool_call.tool == 'none':
             await self._handle_chat_fallback(user_message)
             return
 
-        tool_name = tool_call.get('tool')
-        tool_args = tool_call.get('arguments', {})
+        tool_name = tool_call.tool
+        tool_args = tool_call.arguments
 
         # 2. Basic Argument Validation 
-        required_args = self.tool_arg_map.get(tool_name)
-        if required_args and not all(arg in tool_args and tool_args[arg] for arg in required_args):
+        validator = self._validators.get(tool_name)
+        if validator and not validator(tool_args):
             print(f"⚠️ Tool selected: '{tool_name}', but missing required arguments or arguments were empty. Falling back to chat.\n")
             await self._handle_chat_fallback(user_message, f"Tool selection failed due to missing arguments for {tool_name}.")
             return
@@ -238,26 +497,37 @@ JSON:"""
         # 3. Process Tool Call
         try:
             # Show a loading indicator
-            print("🔍 Searching...", end='', flush=True)
-            raw_data = await self.process_tool_call(tool_name, tool_args)
-            print("\r" + " " * 20 + "\r", end='', flush=True) # Clear the loading message
+            sys.stdout.write("🔍 Searching...")
+            sys.stdout.flush()
+            if speculative:
+                raw_data = await speculative
+            else:
+                raw_data = await self.process_tool_call(tool_name, tool_args)
+            sys.stdout.write("\r\x1b[2K")  # Clear the loading message (ANSI erase line)
+            sys.stdout.flush()
             
             # 4. Error/No Results Detection and Graceful Fallback
             is_error = False
             try:
-                data_json = json.loads(raw_data)
+                data_json = orjson.loads(raw_data)
                 
-                # Check for explicit error or 'not found' messages from the server tools
-                if isinstance(data_json, dict):
+                # Check for explicit error or 'not found' messages from the server tools;
+                # replies listing candidate professors are answered, not treated as errors
+                if isinstance(data_json, dict) and not ('matches' in data_json or 'did_you_mean' in data_json):
                     error_message = data_json.get('error', '').lower()
                     if 'error' in data_json or 'not found' in error_message:
                         is_error = True
                 elif isinstance(data_json, list) and len(data_json) == 0:
                     is_error = True
                         
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass  # Not JSON, proceed with natural response
             
+            if is_error and routed and tool_name == 'get_professor_details':
+                # The pattern guessed a name that isn't a professor; let the LLM decide
+                await self.chat_with_mistral(user_message, route_by_pattern=False)
+                return
+
             if is_error:
                 # CRITICAL: Do NOT print the raw error message to the user!
                 # --- MODIFIED PRINT ---
@@ -274,25 +544,23 @@ JSON:"""
             # Fallback on connection/tool execution error
             await self.make_natural_response(user_message, f"Tool execution failed: {e}")
 
-    def _extract_tool_call(self, text: str) -> Optional[dict]:
+    def _extract_tool_call(self, text: str) -> Optional[ToolCall]:
         """Extract tool call from LLM response"""
-        # Improved extraction
-        try:
-            text = text.replace('```json', '').replace('```', '').strip()
-            start = text.find('{')
-            end = text.rfind('}') + 1
-            
-            if start != -1 and end > start:
-                json_str = text[start:end]
-                tool_call = json.loads(json_str)
-                if 'tool' in tool_call and 'arguments' in tool_call:
-                    return tool_call
-        except:
-            pass
+        # Slice out the JSON object, dropping any prose or code fences around it
+        start = text.find('{')
+        end = text.rfind('}') + 1
+
+        if start != -1 and end > start:
+            try:
+                return _TOOL_DECODER.decode(text[start:end])
+            except msgspec.DecodeError:
+                pass
         return None
 
     async def close(self):
         """Close the connection"""
+        if self.http:
+            await self.http.aclose()
         if hasattr(self, 'session_context') and self.session_context:
             await self.session_context.__aexit__(None, None, None)
         if hasattr(self, 'client_context') and self.client_context:
@@ -320,7 +588,8 @@ async def main():
         print("─" * 60 + "\n")
 
         while True:
-            user_input = input("You: ").strip()
+            # Async read so the event loop keeps serving the MCP session while the user types
+            user_input = (await ainput("You: ")).strip()
 
             if user_input.lower() in ['quit', 'exit', 'bye', 'goodbye']:
                 print("\n👋 See you later! Have an awesome day! 🌟\n")
@@ -34,12 +34,85 @@ VECTOR_CHUNK_OVERLAP = 100
 # Higher = faster initial indexing but more memory
 VECTOR_BATCH_SIZE = 100
 
+# HNSW index search breadth (ef_search)
+# Query cost grows with this value; it must stay >= the number of results
+# Lower = faster queries but may miss the closest chunks
+# Chroma's default is 10, already near the floor for 3-5 results;
+# only raise it if relevant chunks go missing
+VECTOR_HNSW_SEARCH_EF = 10
+
+# HNSW graph connectivity (links per node)
+# Lower = smaller index and faster queries, higher = better recall
+# Only applied when the collection is first created (re-index to change)
+VECTOR_HNSW_M = 16
+
+# Index used to answer knowledge base queries
+# "chroma" = Query ChromaDB directly (default, no extra dependencies)
+# "faiss_sq8" = Build an in-memory FAISS HNSW index with 8-bit quantized
+#   vectors from the stored embeddings on server start (requires faiss-cpu);
+#   ~4x less memory and faster scoring for large document collections
+VECTOR_INDEX = "chroma"
+
+# With "faiss_sq8", fetch n_results * this many candidates from the quantized
+# index, then re-rank them with the exact vectors to recover full precision
+VECTOR_RERANK_FACTOR = 4
+
+# Number of recent knowledge base queries (and query embeddings) kept in memory
+# Repeated questions skip both the embedding call and the index search
+# Note: restart the server after re-indexing so stale results are dropped
+KB_QUERY_CACHE_SIZE = 512
+
 # ============================================
 # LLM GENERATION SETTINGS
 # ============================================
 
+# Backend that serves the LLM
+# "ollama" = Local Ollama daemon (simplest setup)
+# "llama_server" = llama.cpp server with continuous batching
+#   (much higher throughput when several students use it at once)
+#   Start it with:
+#   llama-server -m mistral-7b-instruct-v0.3-q4_k_m.gguf -c 8192 --parallel 8 --cont-batching \
+#       -fa on -ngl 99 -b 2048 --cache-type-k q8_0 --cache-type-v q8_0
+LLM_BACKEND = "ollama"
+
+# Address of the Ollama daemon (only used when LLM_BACKEND = "ollama")
+OLLAMA_URL = "http://localhost:11434"
+
+# Address of the llama.cpp server (only used when LLM_BACKEND = "llama_server")
+LLAMA_SERVER_URL = "http://localhost:8080"
+
+# Speculative decoding on llama-server: a tiny draft model proposes tokens
+# and Mistral verifies them in one batch, typically 2-3x faster generation
+# Enable it by adding to the llama-server command:
+#   --model-draft draft-model-q4_k_m.gguf -ngld 99
+# (the draft model must use the same tokenizer as the main model)
+# Maximum tokens the draft model proposes per step (sent with each request)
+# Note: Ollama has no draft model support, so this only applies to llama-server
+LLAMA_DRAFT_MAX_TOKENS = 8
+
+# Timeout for LLM requests (seconds)
+# Applies per read while streaming, so only long pauses trigger it
+LLM_REQUEST_TIMEOUT = 120
+
 # Model to use (ensure it's installed in Ollama)
-LLM_MODEL = "mistral:7b"
+# The plain "mistral" tag is already 4-bit (Q4_0); the Q4_K_M build is about
+# the same size and speed but gives somewhat better answers
+# Use q5_K_M for higher quality at the cost of more memory and slower tokens
+# Tip: run Ollama with OLLAMA_FLASH_ATTENTION=1 for faster prompt processing
+LLM_MODEL = "mistral:7b-instruct-v0.3-q4_K_M"
+
+# Smaller models for the simple steps (ensure they're installed in Ollama)
+# Tool selection and casual chat are easy tasks that a ~1.5B model handles
+# several times faster than Mistral 7B; LLM_MODEL still writes the answers
+# Set both to LLM_MODEL to use a single model everywhere
+# (llama-server serves one model, so these are ignored with that backend)
+TOOL_SELECTION_MODEL = "qwen2.5:1.5b-instruct"
+CHAT_MODEL = "qwen2.5:1.5b-instruct"
+
+# How long Ollama keeps the model loaded after a request
+# The client also preloads the model on startup, so with a long keep-alive
+# no question ever waits for the model to load ("-1" = never unload)
+LLM_KEEP_ALIVE = "24h"
 
 # Temperature for tool selection (lower = more deterministic)
 # Recommended: 0.05 - 0.1
@@ -57,10 +130,25 @@ CHAT_TEMPERATURE = 0.7
 # Lower = faster tool selection
 TOOL_SELECTION_MAX_TOKENS = 50
 
+# Number of recent tool-selection decisions to cache
+# Repeated questions reuse the cached decision instead of calling the LLM
+TOOL_SELECTION_CACHE_SIZE = 256
+
+# Start a knowledge base search while the LLM is still selecting a tool
+# True = Lower latency for knowledge base questions (result is discarded if another tool wins)
+# False = Strictly sequential: decide first, then call the tool
+ENABLE_SPECULATIVE_PREFETCH = True
+
 # Maximum tokens for natural responses
 # Lower = faster but potentially cut-off responses
 RESPONSE_MAX_TOKENS = 400  # Increased for complete answers
 
+# Limits on tool data passed into the natural response prompt
+# Longer prompts = slower responses, so long lists and texts are trimmed
+# (keep MAX_CHARS >= VECTOR_CHUNK_SIZE so knowledge base chunks stay whole)
+RESPONSE_DATA_MAX_ITEMS = 15
+RESPONSE_DATA_MAX_CHARS = 600
+
 # Maximum tokens for casual chat
 # Lower = faster, more concise chat
 CHAT_MAX_TOKENS = 150
@@ -80,6 +168,13 @@ TOP_P = 0.9
 # Recommended: True for better user experience
 ENABLE_STREAMING = True
 
+# How often streamed text is written to the terminal
+# Tokens are buffered and flushed every STREAM_FLUSH_INTERVAL seconds
+# or once STREAM_FLUSH_CHARS characters are pending, whichever comes first
+# Lower = smoother typing effect but more terminal writes
+STREAM_FLUSH_INTERVAL = 0.02
+STREAM_FLUSH_CHARS = 64
+
 # ============================================
 # WEB SCRAPING SETTINGS
 # ============================================
@@ -87,6 +182,26 @@ ENABLE_STREAMING = True
 # Timeout for web requests (seconds)
 WEB_REQUEST_TIMEOUT = 10
 
+# How long scraped news/notifications are reused before re-scraping (seconds)
+# Higher = faster repeat answers and less load on the BMSCE site,
+# but new announcements take longer to show up
+SCRAPE_CACHE_TTL = 300
+
+# ============================================
+# PROFESSOR SEARCH SETTINGS
+# ============================================
+
+# Minimum similarity (0-100) between each query word and a name word for a
+# misspelt name to match; a single match is returned marked as approximate,
+# several are offered as "did you mean" suggestions
+# Only used when no professor name contains the query (e.g. "jevrgi")
+# Lower = tolerates more typos but suggests more unrelated names
+# Recommended: 85 - 95
+PROFESSOR_FUZZY_CUTOFF = 90
+
+# Maximum number of names suggested (listed best first)
+PROFESSOR_FUZZY_LIMIT = 5
+
 # ============================================
 # PERFORMANCE TUNING NOTES
 # ============================================
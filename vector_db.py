@@ -1,5 +1,6 @@
 import os
 import chromadb
+import numpy as np
 from chromadb.utils import embedding_functions
 from PyPDF2 import PdfReader
 from config import (
@@ -7,7 +8,10 @@ from config import (
     VECTOR_CHUNK_OVERLAP,
     VECTOR_BATCH_SIZE,
     VECTOR_N_RESULTS,
-    VECTOR_DISTANCE_THRESHOLD
+    VECTOR_DISTANCE_THRESHOLD,
+    VECTOR_HNSW_SEARCH_EF,
+    VECTOR_HNSW_M,
+    VECTOR_RERANK_FACTOR
 )
 
 # -----------------------------
@@ -46,11 +50,54 @@ client = chromadb.PersistentClient(path=PERSIST_DIR)
 ollama_ef = embedding_functions.OllamaEmbeddingFunction(model_name="nomic-embed-text:v1.5")
 
 # Create or load collection
+# HNSW index parameters only apply when the collection is first created;
+# delete chroma_storage and re-index to change them
 collection = client.get_or_create_collection(
     name="docs",
-    embedding_function=ollama_ef
+    embedding_function=ollama_ef,
+    metadata={
+        "hnsw:search_ef": VECTOR_HNSW_SEARCH_EF,
+        "hnsw:M": VECTOR_HNSW_M,
+    }
 )
 
+# -----------------------------
+# Compressed in-memory index (optional)
+# -----------------------------
+class QuantizedIndex:
+    """
+    FAISS HNSW index over 8-bit scalar-quantized copies of the stored embeddings.
+    Uses ~4x less memory than float32 and scores with fast int8 arithmetic;
+    a shortlist is then re-ranked with the exact float32 vectors.
+    """
+
+    def __init__(self, source_collection):
+        import faiss  # optional dependency: pip install faiss-cpu
+
+        stored = source_collection.get(include=["embeddings", "documents"])
+        self.documents = stored["documents"]
+        self.vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+
+        dim = self.vectors.shape[1]
+        self.index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, VECTOR_HNSW_M)
+        self.index.train(self.vectors)
+        self.index.add(self.vectors)
+
+    def search(self, query_embedding, n_results: int = VECTOR_N_RESULTS) -> list:
+        """Return the n_results closest documents, best first"""
+        query = np.asarray([query_embedding], dtype=np.float32)
+
+        # Stage 1: wide, approximate search on the quantized vectors
+        shortlist = n_results * VECTOR_RERANK_FACTOR
+        self.index.hnsw.efSearch = max(VECTOR_HNSW_SEARCH_EF, shortlist)
+        _, ids = self.index.search(query, shortlist)
+        ids = ids[0][ids[0] >= 0]
+
+        # Stage 2: exact squared-L2 re-rank of the shortlist (matches Chroma's default space)
+        distances = ((self.vectors[ids] - query) ** 2).sum(axis=1)
+        best = ids[np.argsort(distances)[:n_results]]
+        return [self.documents[i] for i in best]
+
 # -----------------------------
 # Add PDF to VectorDB
 # -----------------------------
@@ -121,6 +168,7 @@ if __name__ == "__main__":
     print(f"  Batch Size: {VECTOR_BATCH_SIZE}")
     print(f"  Distance Threshold: {VECTOR_DISTANCE_THRESHOLD}")
     print(f"  N Results: {VECTOR_N_RESULTS}")
+    print(f"  HNSW search_ef / M: {VECTOR_HNSW_SEARCH_EF} / {VECTOR_HNSW_M}")
     print("\n" + "=" * 60)
     
     # Add PDFs to vector database
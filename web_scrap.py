@@ -1,24 +1,32 @@
 import re
-import json
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from config import WEB_REQUEST_TIMEOUT
 
-def get_news_events():
+# Shared by both scrapers so repeat scrapes reuse the open HTTP/2 connection
+# instead of paying for a new TCP + TLS handshake every time
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=WEB_REQUEST_TIMEOUT,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=4)
+)
+
+async def get_news_events():
     """
     Scrape news and events from BMSCE website.
     Uses WEB_REQUEST_TIMEOUT from config.py for request timeout.
+    Returns a list of {"date", "title"} dicts, or an {"error": ...} dict.
     """
     url = "https://bmsce.ac.in"
     try:
-        response = requests.get(url, timeout=WEB_REQUEST_TIMEOUT)
+        response = await _CLIENT.get(url)
         # Raise an exception for bad status codes (4xx or 5xx)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, "lxml")
 
-    except requests.exceptions.RequestException as e:
-        error_message = json.dumps({"error": f"Failed to retrieve the webpage: {e}"}, indent=4)
-        return error_message
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to retrieve the webpage: {e}"}
 
     news_list = []
     articles = soup.select(".col-sm-12.col-md-12.col-lg-12 article")
@@ -39,31 +47,30 @@ def get_news_events():
             "title": title
         })
     
-    # Convert the list of dictionaries to a JSON string
-    return json.dumps(news_list, indent=4)
+    return news_list
 
 
-def get_notifications():
+async def get_notifications():
     """
     Scrape notifications from BMSCE website.
     Uses WEB_REQUEST_TIMEOUT from config.py for request timeout.
+    Returns a list of {"notification", "date"} dicts, or an {"error": ...} dict.
     """
     url = "https://bmsce.ac.in"
     try:
-        response = requests.get(url, timeout=WEB_REQUEST_TIMEOUT)
+        response = await _CLIENT.get(url)
         # Raise an exception for bad status codes (4xx or 5xx)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, "lxml")
 
-    except requests.exceptions.RequestException as e:
-        error_message = json.dumps({"error": f"Failed to retrieve the webpage: {e}"}, indent=4)
-        return error_message
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to retrieve the webpage: {e}"}
 
     notifications_list = []
     college_tab = soup.find("div", {"id": "CollegeNotifications"})
     
     if not college_tab:
-        return json.dumps([{"error": "College notifications section not found."}], indent=4)
+        return {"error": "College notifications section not found."}
 
     notifications = college_tab.find_all("li", class_="text-justify")
 
@@ -88,5 +95,4 @@ def get_notifications():
             "date": date
         })
         
-    # Convert the list of dictionaries to a JSON string
-    return json.dumps(notifications_list, indent=4)
+    return notifications_list